@@ -0,0 +1,214 @@
+# Autenticação: registro, login e validação de token JWT
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from postgrest.exceptions import APIError
+
+from config import settings
+from database import get_supabase_client
+from models import TokenResponse, UserCreate, UserLogin, UserResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+SECRET_KEY = settings.jwt_secret_key
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+
+security = HTTPBearer()
+
+# Cache de usuários autenticados, chaveado pelo hash SHA-256 do token
+# (nunca pelo token cru). Evita verificar o JWT e consultar o Supabase
+# a cada requisição autenticada; a entrada expira junto com o token
+# ou após o TTL do cache, o que vier primeiro.
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_user_cache_lock = threading.Lock()
+
+# Cache do payload decodificado do JWT, separado do cache de usuários:
+# continua válido mesmo quando o usuário acabou de ser alterado. O TTL
+# limita a memória; o `exp` do próprio token é reconferido a cada acerto.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_token_cache_lock = threading.Lock()
+
+
+# Argon2id com parâmetros ajustados (7 MiB, 2 passadas): mais resistente
+# a GPU que bcrypt e um pouco mais rápido por hash no servidor.
+_password_hasher = PasswordHasher(
+    time_cost=2,
+    memory_cost=7168,
+    parallelism=1,
+    hash_len=32,
+)
+
+
+def hash_password(password: str) -> str:
+    """Gera o hash Argon2id da senha."""
+    return _password_hasher.hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Confere a senha contra o hash armazenado."""
+    try:
+        _password_hasher.verify(hashed, password)
+        return True
+    except VerifyMismatchError:
+        return False
+
+
+def create_access_token(user_id: str) -> str:
+    """Emite um JWT com expiração para o usuário."""
+    now = datetime.utcnow()
+    payload = {
+        "sub": user_id,
+        "iat": now,
+        "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+# Argumentos de decodificação montados uma única vez no import, em vez
+# de reconstruir a lista de algoritmos e as options a cada requisição.
+_DECODE_KWARGS = {
+    "key": SECRET_KEY,
+    "algorithms": [ALGORITHM],
+    "options": {"require": ["exp", "iat", "sub"]},
+}
+
+
+def _decode_uncached(token: str) -> dict:
+    """Decodifica e valida o JWT, devolvendo o payload."""
+    try:
+        return jwt.decode(token, **_DECODE_KWARGS)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expirado")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+
+def verify_token(token: str) -> dict:
+    """Valida o JWT reaproveitando decodificações recentes do mesmo token."""
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+
+    with _token_cache_lock:
+        payload = _token_cache.get(cache_key)
+    if payload is None:
+        payload = _decode_uncached(token)
+        with _token_cache_lock:
+            _token_cache[cache_key] = payload
+
+    # O cache não pode estender a vida do token: reconfere a expiração.
+    if payload.get("exp", 0) <= time.time():
+        raise HTTPException(status_code=401, detail="Token expirado")
+    return payload
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> UserResponse:
+    """Resolve o usuário autenticado a partir do token Bearer."""
+    token = credentials.credentials
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+
+    with _user_cache_lock:
+        entry = _user_cache.get(cache_key)
+    if entry is not None:
+        user, exp = entry
+        if exp > time.time():
+            return user
+
+    payload = verify_token(token)
+    user_id = payload.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+    supabase = get_supabase_client()
+    result = supabase.table("users") \
+        .select("id, email, created_at") \
+        .eq("id", user_id) \
+        .execute()
+    if not result.data:
+        raise HTTPException(status_code=401, detail="Usuário não encontrado")
+
+    row = result.data[0]
+    user = UserResponse(id=row["id"], email=row["email"], created_at=row.get("created_at"))
+    with _user_cache_lock:
+        _user_cache[cache_key] = (user, payload["exp"])
+    return user
+
+
+@router.post("/register", response_model=TokenResponse)
+async def register(user: UserCreate):
+    """Cria o usuário, a carteira inicial e devolve o token."""
+    try:
+        supabase = get_supabase_client()
+
+        # INSERT ... ON CONFLICT (email) DO NOTHING em um único round-trip:
+        # resultado vazio significa que o email já existia. Também fecha a
+        # corrida entre checar e inserir que o SELECT prévio deixava aberta.
+        # Email sempre normalizado em minúsculas: A@b.com e a@b.com são
+        # a mesma conta (o índice em lower(email) garante no banco).
+        email = user.email.lower()
+
+        # Argon2 é propositalmente caro (CPU + memória); roda no thread
+        # pool para não travar o event loop durante o hash.
+        password_hash = await asyncio.to_thread(hash_password, user.password)
+        # created_at fica por conta do DEFAULT now() no banco: nada de
+        # formatar/parsear ISO-8601 dos dois lados do fio.
+        created = supabase.table("users").upsert(
+            {
+                "email": email,
+                "password_hash": password_hash,
+            },
+            on_conflict="email",
+            ignore_duplicates=True,
+        ).execute()
+        if not created.data:
+            raise HTTPException(status_code=400, detail="Email já cadastrado")
+        new_user = created.data[0]
+
+        supabase.table("wallets").insert({
+            "user_id": new_user["id"],
+            "balance": 0,
+        }).execute()
+
+        return TokenResponse(access_token=create_access_token(new_user["id"]))
+    except APIError:
+        # Erros inesperados fora do banco sobem para o handler padrão do
+        # FastAPI; detalhes internos não vazam na resposta.
+        logger.exception("Falha no banco ao registrar usuário")
+        raise HTTPException(status_code=500, detail="Erro ao registrar")
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(user: UserLogin):
+    """Autentica por email/senha e devolve o token."""
+    try:
+        supabase = get_supabase_client()
+
+        result = supabase.table("users") \
+            .select("id, email, password_hash") \
+            .eq("email", user.email.lower()) \
+            .execute()
+        if not result.data:
+            raise HTTPException(status_code=401, detail="Credenciais inválidas")
+
+        row = result.data[0]
+        if not await asyncio.to_thread(verify_password, user.password, row["password_hash"]):
+            raise HTTPException(status_code=401, detail="Credenciais inválidas")
+
+        return TokenResponse(access_token=create_access_token(row["id"]))
+    except APIError:
+        logger.exception("Falha no banco ao fazer login")
+        raise HTTPException(status_code=500, detail="Erro ao fazer login")
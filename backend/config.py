@@ -0,0 +1,38 @@
+# Configuração carregada e validada uma única vez no import
+
+import os
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Settings:
+    supabase_url: str
+    supabase_key: str
+    supabase_db_url: str
+    jwt_secret_key: str
+    db_pool_min_size: int
+    db_pool_max_size: int
+    db_statement_cache_size: int
+
+
+def _load_settings() -> Settings:
+    url = os.getenv("SUPABASE_URL", "")
+    key = os.getenv("SUPABASE_KEY", "")
+    if not url or not key:
+        raise RuntimeError("SUPABASE_URL e SUPABASE_KEY precisam estar definidas")
+    return Settings(
+        supabase_url=url,
+        supabase_key=key,
+        supabase_db_url=os.getenv("SUPABASE_DB_URL", ""),
+        jwt_secret_key=os.getenv("JWT_SECRET_KEY", "troque-esta-chave-em-producao"),
+        db_pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "10")),
+        db_pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "50")),
+        # 0 desativa prepared statements implícitos (necessário atrás do
+        # pooler em modo transação; em modo sessão deixe o padrão).
+        db_statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+    )
+
+
+# Falha no boot (e não na primeira requisição) se faltar configuração;
+# os caminhos quentes leem atributos constantes em vez de os.getenv.
+settings = _load_settings()
@@ -0,0 +1,54 @@
+# Conexão com o Supabase (REST) e pool asyncpg direto no Postgres
+
+from functools import cache
+
+import asyncpg
+from supabase import Client, create_client
+
+from config import settings
+
+_db_pool = None
+
+
+@cache
+def get_supabase_client() -> Client:
+    """Retorna o cliente Supabase (singleton, memoizado e thread-safe)."""
+    return create_client(settings.supabase_url, settings.supabase_key)
+
+
+async def init_db_pool() -> None:
+    """Cria o pool asyncpg para os caminhos quentes.
+
+    Fala direto com o Postgres do Supabase (pooler em modo sessão, porta
+    5432), evitando um request HTTPS via PostgREST por operação.
+
+    Em modo sessão o asyncpg prepara e cacheia os statements quentes por
+    conexão (``statement_cache_size``), pulando parse+plan nas execuções
+    seguintes. Atrás do Supavisor em modo transação isso quebra: defina
+    ``DB_STATEMENT_CACHE_SIZE=0`` nesse caso.
+    """
+    global _db_pool
+    if not settings.supabase_db_url:
+        raise RuntimeError("SUPABASE_DB_URL precisa estar definida")
+    _db_pool = await asyncpg.create_pool(
+        settings.supabase_db_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        statement_cache_size=settings.db_statement_cache_size,
+        command_timeout=10,
+    )
+
+
+async def close_db_pool() -> None:
+    """Fecha o pool asyncpg no shutdown."""
+    global _db_pool
+    if _db_pool is not None:
+        await _db_pool.close()
+        _db_pool = None
+
+
+def get_db_pool() -> asyncpg.Pool:
+    """Retorna o pool asyncpg já inicializado."""
+    if _db_pool is None:
+        raise RuntimeError("Pool de banco não inicializado (init_db_pool)")
+    return _db_pool
@@ -0,0 +1,49 @@
+# Modelos Pydantic da API (usuários, carteira e atividades)
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr
+
+
+class UserCreate(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class UserResponse(BaseModel):
+    id: str
+    email: str
+    created_at: Optional[datetime] = None
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+
+class WalletResponse(BaseModel):
+    user_id: str
+    balance: int
+    updated_at: Optional[datetime] = None
+
+
+class ActivityCreate(BaseModel):
+    activity_type: str
+    duration_minutes: int
+    notes: Optional[str] = None
+
+
+class ActivityResponse(BaseModel):
+    id: str
+    user_id: str
+    activity_type: str
+    coins_earned: int
+    duration_minutes: int
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
@@ -0,0 +1,22 @@
+-- Streak de dias consecutivos com atividade, calculado no Postgres.
+-- Evita transferir até 60 dias de linhas cruas para o Python.
+create or replace function calculate_streak(uid uuid)
+returns int
+language sql
+stable
+as $$
+    with days as (
+        select distinct date_trunc('day', created_at)::date as d
+        from activities
+        where user_id = uid
+          and created_at > now() - interval '60 days'
+    )
+    select count(*)::int
+    from (
+        -- cast para int: date - bigint não existe no Postgres
+        select d,
+               (row_number() over (order by d desc) - 1)::int as offset_days
+        from days
+    ) numbered
+    where d = current_date - offset_days;
+$$;
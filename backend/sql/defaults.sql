@@ -0,0 +1,5 @@
+-- Timestamps preenchidos pelo próprio banco: os clientes não enviam
+-- (nem formatam/parseiam) datas pela rede.
+alter table users alter column created_at set default now();
+alter table activities alter column created_at set default now();
+alter table wallets alter column updated_at set default now();
@@ -0,0 +1,22 @@
+-- Índices dos caminhos quentes.
+
+-- Login e registro buscam por email; o índice único também garante
+-- unicidade no banco (não só na checagem da aplicação). Fica no valor
+-- cru porque o upsert do registro (ON CONFLICT (email)) precisa de um
+-- índice único na coluna em si.
+create unique index if not exists users_email_key on users (email);
+
+-- Emails são case-insensitive: a aplicação normaliza para minúsculas
+-- em register/login, e este índice impede que linhas legadas com
+-- casing distinto virem contas duplicadas. (Se já houver duplicatas
+-- divergindo só no casing, resolva-as antes de aplicar.)
+create unique index if not exists users_email_lower_key on users (lower(email));
+
+-- Histórico e streak filtram por user_id e ordenam/filtram por
+-- created_at; o índice composto evita a ordenação pós-scan. O INCLUDE
+-- de coins_earned deixa o COUNT/SUM do /stats em index-only scan, sem
+-- tocar o heap. (Em produção, crie com CONCURRENTLY.)
+drop index if exists activities_user_created_idx;
+create index if not exists activities_user_created_idx
+    on activities (user_id, created_at desc)
+    include (coins_earned);
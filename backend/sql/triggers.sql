@@ -0,0 +1,17 @@
+-- Mantém wallets.updated_at no banco: nenhum cliente precisa enviar
+-- (nem formatar/parsear) o timestamp pela rede.
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists wallets_set_updated_at on wallets;
+create trigger wallets_set_updated_at
+    before update on wallets
+    for each row
+    execute function set_updated_at();
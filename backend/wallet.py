@@ -0,0 +1,357 @@
+# Carteira e atividades: saldo, ganho de moedas, streak e estatísticas
+
+import asyncio
+import logging
+from functools import lru_cache
+from typing import List
+
+import asyncpg
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from postgrest.exceptions import APIError
+
+from auth import get_current_user
+from database import get_db_pool, get_supabase_client
+from models import ActivityCreate, UserResponse, WalletResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/wallet", tags=["wallet"])
+
+# Moedas base por tipo de atividade produtiva
+ACTIVITY_COINS = {
+    "estudo": 10,
+    "exercicio": 15,
+    "leitura": 8,
+    "meditacao": 5,
+    "trabalho": 12,
+}
+
+# Dias de streak -> multiplicador de moedas
+STREAK_MULTIPLIERS = {
+    3: 1.2,
+    7: 1.5,
+    14: 2.0,
+    30: 3.0,
+}
+
+# Ordenações pré-computadas no import: /earn e /stats consultam os
+# marcos a cada requisição e não precisam reordenar o dict toda vez.
+_MULTIPLIERS_DESC = tuple(sorted(STREAK_MULTIPLIERS.items(), reverse=True))
+_MULTIPLIERS_ASC = tuple(sorted(STREAK_MULTIPLIERS.items()))
+
+
+# O saldo só muda quando /earn credita, mas o dashboard consulta
+# /balance em polling. Cache por usuário com escrita direta (write-
+# through) no /earn, para leituras repetidas não baterem no banco.
+_wallet_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+# Single-flight: sob pico, N GETs /balance simultâneos do mesmo usuário
+# compartilham uma única consulta em vez de N SELECTs idênticos.
+_balance_inflight: dict = {}
+
+
+async def _fetch_wallet(user_id: str):
+    pool = get_db_pool()
+    row = await pool.fetchrow(
+        "SELECT user_id, balance, updated_at FROM wallets WHERE user_id = $1",
+        user_id,
+    )
+    if row is None:
+        return None
+    wallet = WalletResponse(user_id=str(row["user_id"]), balance=row["balance"],
+                            updated_at=row["updated_at"])
+    _wallet_cache[user_id] = wallet
+    return wallet
+
+
+@lru_cache(maxsize=1024)
+def get_streak_multiplier(streak_days: int) -> float:
+    """Devolve o multiplicador correspondente ao streak atual."""
+    for days, multiplier in _MULTIPLIERS_DESC:
+        if streak_days >= days:
+            return multiplier
+    return 1.0
+
+
+@lru_cache(maxsize=1024)
+def get_next_streak_target(streak_days: int):
+    """Próximo marco de streak, ou None se já atingiu o máximo."""
+    for days, _ in _MULTIPLIERS_ASC:
+        if streak_days < days:
+            return days
+    return None
+
+
+async def calculate_user_streak(user_id: str) -> int:
+    """Conta os dias consecutivos (até hoje) com pelo menos uma atividade.
+
+    A contagem roda inteira no Postgres (função ``calculate_streak`` em
+    ``sql/calculate_streak.sql``): a resposta é um único inteiro em vez
+    de até 60 dias de linhas cruas.
+    """
+    pool = get_db_pool()
+    streak = await pool.fetchval("SELECT calculate_streak($1)", user_id)
+    return streak or 0
+
+
+@router.get("/balance", response_model=WalletResponse)
+async def get_balance(current_user: UserResponse = Depends(get_current_user)):
+    """Saldo atual da carteira do usuário."""
+    try:
+        cached = _wallet_cache.get(current_user.id)
+        if cached is not None:
+            return cached
+
+        task = _balance_inflight.get(current_user.id)
+        if task is None:
+            task = asyncio.create_task(_fetch_wallet(current_user.id))
+            _balance_inflight[current_user.id] = task
+            try:
+                wallet = await task
+            finally:
+                _balance_inflight.pop(current_user.id, None)
+        else:
+            wallet = await task
+
+        if wallet is None:
+            raise HTTPException(status_code=404, detail="Carteira não encontrada")
+        return wallet
+    except asyncpg.PostgresError:
+        logger.exception("Falha no banco ao buscar saldo")
+        raise HTTPException(status_code=500, detail="Erro ao buscar saldo")
+
+
+async def _credit_wallet(user_id: str, coins: int) -> None:
+    """Crédito diferido do /earn; roda depois da resposta.
+
+    Se falhar, a falha é assíncrona: loga para reconciliação (a
+    atividade já inserida guarda o valor devido).
+    """
+    try:
+        row = await get_db_pool().fetchrow(
+            "UPDATE wallets SET balance = balance + $1 "
+            "WHERE user_id = $2 RETURNING balance, updated_at",
+            coins,
+            user_id,
+        )
+        if row is None:
+            logger.error("Carteira não encontrada ao creditar user_id=%s", user_id)
+            return
+        _wallet_cache[user_id] = WalletResponse(
+            user_id=user_id,
+            balance=row["balance"],
+            updated_at=row["updated_at"],
+        )
+    except asyncpg.PostgresError:
+        logger.exception("Falha ao creditar carteira de user_id=%s; reconciliar", user_id)
+
+
+@router.post("/earn", status_code=202)
+async def earn_coins(
+    activity: ActivityCreate,
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """Registra uma atividade e credita as moedas (com bônus de streak).
+
+    Responde 202 assim que a atividade está gravada; o crédito na
+    carteira roda em background e o saldo devolvido é o projetado.
+    """
+    try:
+        if activity.activity_type not in ACTIVITY_COINS:
+            raise HTTPException(status_code=400, detail="Tipo de atividade inválido")
+
+        streak = await calculate_user_streak(current_user.id)
+        multiplier = get_streak_multiplier(streak)
+        base_coins = ACTIVITY_COINS[activity.activity_type]
+        final_coins = int(base_coins * multiplier)
+
+        pool = get_db_pool()
+
+        # Resolve a carteira antes de gravar a atividade: um 404 aqui
+        # não pode deixar uma atividade já inserida para trás.
+        cached = _wallet_cache.get(current_user.id)
+        if cached is not None:
+            current_balance = cached.balance
+        else:
+            current_balance = await pool.fetchval(
+                "SELECT balance FROM wallets WHERE user_id = $1",
+                current_user.id,
+            )
+            if current_balance is None:
+                raise HTTPException(status_code=404, detail="Carteira não encontrada")
+
+        await pool.execute(
+            "INSERT INTO activities "
+            "(user_id, activity_type, coins_earned, duration_minutes, notes) "
+            "VALUES ($1, $2, $3, $4, $5)",
+            current_user.id,
+            activity.activity_type,
+            final_coins,
+            activity.duration_minutes,
+            activity.notes,
+        )
+        new_balance = current_balance + final_coins
+
+        # O UPDATE (incremento atômico) sai da janela da requisição; o
+        # cache já reflete o saldo projetado para os próximos GETs, e o
+        # _credit_wallet o corrige com o valor real ao terminar.
+        background_tasks.add_task(_credit_wallet, current_user.id, final_coins)
+        _wallet_cache[current_user.id] = WalletResponse(
+            user_id=current_user.id,
+            balance=new_balance,
+        )
+
+        return {
+            "coins_earned": final_coins,
+            "base_coins": base_coins,
+            "streak_days": streak,
+            "multiplier": multiplier,
+            "new_balance": new_balance,
+        }
+    except asyncpg.PostgresError:
+        logger.exception("Falha no banco ao registrar atividade")
+        raise HTTPException(status_code=500, detail="Erro ao registrar atividade")
+
+
+@router.post("/earn_bulk")
+async def earn_coins_bulk(
+    activities: List[ActivityCreate],
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """Registra um lote de atividades (ex.: fila offline do app) de uma vez."""
+    try:
+        if not activities:
+            raise HTTPException(status_code=400, detail="Lote vazio")
+        for item in activities:
+            if item.activity_type not in ACTIVITY_COINS:
+                raise HTTPException(status_code=400, detail="Tipo de atividade inválido")
+
+        streak = await calculate_user_streak(current_user.id)
+        multiplier = get_streak_multiplier(streak)
+
+        rows = [
+            (
+                current_user.id,
+                item.activity_type,
+                int(ACTIVITY_COINS[item.activity_type] * multiplier),
+                item.duration_minutes,
+                item.notes,
+            )
+            for item in activities
+        ]
+        total_coins = sum(row[2] for row in rows)
+
+        columns = ["user_id", "activity_type", "coins_earned", "duration_minutes", "notes"]
+        pool = get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # COPY para lotes grandes, executemany (um round-trip,
+                # statement preparado) para os pequenos.
+                if len(rows) > 100:
+                    await conn.copy_records_to_table(
+                        "activities", records=rows, columns=columns,
+                    )
+                else:
+                    await conn.executemany(
+                        "INSERT INTO activities "
+                        "(user_id, activity_type, coins_earned, duration_minutes, notes) "
+                        "VALUES ($1, $2, $3, $4, $5)",
+                        rows,
+                    )
+                wallet_row = await conn.fetchrow(
+                    "UPDATE wallets SET balance = balance + $1 "
+                    "WHERE user_id = $2 RETURNING balance, updated_at",
+                    total_coins,
+                    current_user.id,
+                )
+                # Ainda dentro da transação: sem carteira, o raise
+                # desfaz os inserts do lote em vez de deixá-los órfãos.
+                if wallet_row is None:
+                    raise HTTPException(status_code=404, detail="Carteira não encontrada")
+
+        _wallet_cache[current_user.id] = WalletResponse(
+            user_id=current_user.id,
+            balance=wallet_row["balance"],
+            updated_at=wallet_row["updated_at"],
+        )
+
+        return {
+            "activities_recorded": len(rows),
+            "coins_earned": total_coins,
+            "streak_days": streak,
+            "multiplier": multiplier,
+            "new_balance": wallet_row["balance"],
+        }
+    except asyncpg.PostgresError:
+        logger.exception("Falha no banco ao registrar lote")
+        raise HTTPException(status_code=500, detail="Erro ao registrar lote")
+
+
+@router.get("/stats")
+async def get_user_stats(current_user: UserResponse = Depends(get_current_user)):
+    """Estatísticas do usuário: saldo, totais de atividades e streak."""
+    try:
+        pool = get_db_pool()
+
+        # Tudo em um único round-trip: saldo, agregados e streak (via a
+        # função calculate_streak já instalada no banco) voltam na mesma
+        # linha, em vez de quatro consultas paralelas.
+        row = await pool.fetchrow(
+            """
+            WITH acts AS (
+                SELECT activity_type, coins_earned
+                FROM activities
+                WHERE user_id = $1
+            )
+            SELECT
+                (SELECT balance FROM wallets WHERE user_id = $1) AS balance,
+                (SELECT count(*) FROM acts) AS total_activities,
+                (SELECT coalesce(sum(coins_earned), 0) FROM acts) AS total_coins,
+                (SELECT activity_type FROM acts
+                 GROUP BY activity_type ORDER BY count(*) DESC LIMIT 1) AS favorite,
+                calculate_streak($1) AS streak
+            """,
+            current_user.id,
+        )
+        streak = row["streak"]
+
+        return {
+            "balance": row["balance"] or 0,
+            "total_activities": row["total_activities"],
+            "total_coins_earned": row["total_coins"],
+            "favorite_activity": row["favorite"],
+            "streak_days": streak,
+            "streak_multiplier": get_streak_multiplier(streak),
+            "next_streak_target": get_next_streak_target(streak),
+        }
+    except asyncpg.PostgresError:
+        logger.exception("Falha no banco ao buscar estatísticas")
+        raise HTTPException(status_code=500, detail="Erro ao buscar estatísticas")
+
+
+@router.get("/activities/history")
+async def get_activity_history(
+    limit: int = 20,
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """Histórico recente de atividades do usuário."""
+    try:
+        supabase = get_supabase_client()
+        # count='exact' faz o Postgres devolver o total real junto da
+        # página; len(data) reportava no máximo `limit`.
+        activities_result = supabase.table("activities") \
+            .select("*", count="exact") \
+            .eq("user_id", current_user.id) \
+            .order("created_at", desc=True) \
+            .limit(limit) \
+            .execute()
+
+        return {
+            "activities": activities_result.data,
+            "total": activities_result.count,
+        }
+    except APIError:
+        logger.exception("Falha no banco ao buscar histórico")
+        raise HTTPException(status_code=500, detail="Erro ao buscar histórico")